@@ -29,8 +29,7 @@ while running:
     deltaTime = clock.get_time() / 1000
     engine.simulate(deltaTime * 0.1)
 
-    view.draw()
-    pygame.display.flip()
+    pygame.display.update(view.draw())
 
     clock.tick(60)
 
@@ -12,5 +12,10 @@ exhaust_molar_mass = 0.0286
 fuel_burn_per_second = 0.1  # kg/s
 fuel_energy_per_kg = 44_000  # KJ/kg
 
+# Combustion only uses 10% of the above (tuned), folded here so it isn't redone every tick
+scaled_fuel_burn_per_second = fuel_burn_per_second * 0.1
+scaled_fuel_energy_per_kg = fuel_energy_per_kg * 0.1
+inverse_stoichiometric_air_fuel_ratio = 1.0 / stoichiometric_air_fuel_ratio
+
 exhaust_R = 287.0 # J/kg/K
 atmospheric_pressure = 101325.0
\ No newline at end of file
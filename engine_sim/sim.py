@@ -1,7 +1,11 @@
 import math
+from array import array
 
 from .constants import *
 
+# Bound once, the per tick code calls these without the module attribute lookup
+_sin, _cos, _asin, _sqrt, _pi = math.sin, math.cos, math.asin, math.sqrt, math.pi
+
 """
 4 Stroke
 Inline 4
@@ -11,7 +15,39 @@ All measurements in mm / radians / Kelvin
 
 ROOM_TEMP = 273 + 21
 
+GAMMA = 1.4  # for air
+GAMMA_MINUS_1 = GAMMA - 1.0
+
+# Particles per kg of each species
+FUEL_PARTICLES_COEFF = avogadro_constant / fuel_molar_mass
+AIR_PARTICLES_COEFF = avogadro_constant / air_molar_mass
+EXHAUST_PARTICLES_COEFF = avogadro_constant / exhaust_molar_mass
+
+# Boltzmann folded in, so pressure = temperature * sum(mass * coeff) / volume
+FUEL_PRESSURE_COEFF = boltzmann_constant * FUEL_PARTICLES_COEFF
+AIR_PRESSURE_COEFF = boltzmann_constant * AIR_PARTICLES_COEFF
+EXHAUST_PRESSURE_COEFF = boltzmann_constant * EXHAUST_PARTICLES_COEFF
+
+TWO_PI = 2.0 * _pi
+FOUR_PI = 4.0 * _pi  # One full 4 stroke cycle
+INV_PI = 1.0 / _pi
+RAD_PER_SECOND_TO_RPM = 60.0 / TWO_PI
+
+# crank_moment is evaluated at crank_rotation + pi/8, expand via angle addition instead of calling sin() again
+_PI_8 = _pi / 8.0
+_SIN_PI_8 = _sin(_PI_8)
+_COS_PI_8 = _cos(_PI_8)
+
 class Cylinder:
+    __slots__ = (
+        "radius", "height", "crank_radius", "rod_length",
+        "area", "stroke", "volume_at_TDC", "external_piston_pressure",
+        "_rod_length_sq", "_crank_radius_sq",
+        "_crank_rotation", "_sin_theta", "_cos_theta", "_pin_offset", "_volume",
+        "crank_angular_velocity", "__combusting", "temperature", "mode",
+        "m_fuel", "m_air", "m_exhaust", "previous_volume",
+    )
+
     def __init__(self, radius: float, height: float, crank_radius: float, rod_length: float):
         self.radius = radius
         self.height = height
@@ -19,6 +55,14 @@ class Cylinder:
         self.crank_radius = crank_radius
         self.rod_length = rod_length
 
+        # Constant for the lifetime of the cylinder
+        self.area = _pi * radius * radius
+        self.stroke = 2.0 * crank_radius
+        self.volume_at_TDC = self.area * (height - crank_radius + rod_length)
+        self.external_piston_pressure = self.area * atmospheric_pressure
+        self._rod_length_sq = rod_length * rod_length
+        self._crank_radius_sq = crank_radius * crank_radius
+
         self.crank_rotation = 0.0
         self.crank_angular_velocity = 0.0
 
@@ -27,51 +71,58 @@ class Cylinder:
         self.temperature = ROOM_TEMP  # kelvin
         self.mode = "None"
 
-        self.contents = {
-            "fuel": 0.0,  # kg
-            "air": 0.0,  # kg
-            "exhaust": 0.0  # kg
-        }
+        # Contents, kg
+        self.m_fuel = 0.0
+        self.m_air = 0.0
+        self.m_exhaust = 0.0
+
+        self.previous_volume = self.volume
+
+    @property
+    def crank_rotation(self):
+        return self._crank_rotation
+
+    @crank_rotation.setter
+    def crank_rotation(self, value: float):
+        """ Angle dependent geometry is only recomputed when the crank actually moves """
+        sin_theta = _sin(value)
+        cos_theta = _cos(value)
+
+        # See pin_offset for the derivation. Every tick needs the volume, so work it out here rather than lazily
+        pin_offset = self.crank_radius * cos_theta + _sqrt(
+            self._rod_length_sq - (self._crank_radius_sq * sin_theta * sin_theta))
 
-        self.previous_volume = float(self.volume)
+        self._crank_rotation = value
+        self._sin_theta = sin_theta
+        self._cos_theta = cos_theta
+        self._pin_offset = pin_offset
+        self._volume = self.area * (self.height - pin_offset)
 
     @property
     def fuel_particles(self):
-        return (self.contents["fuel"] / fuel_molar_mass) * avogadro_constant
+        return self.m_fuel * FUEL_PARTICLES_COEFF
 
     @property
     def air_particles(self):
-        return (self.contents["air"] / air_molar_mass) * avogadro_constant
+        return self.m_air * AIR_PARTICLES_COEFF
 
     @property
     def exhaust_particles(self):
-        return (self.contents["exhaust"] / exhaust_molar_mass) * avogadro_constant
+        return self.m_exhaust * EXHAUST_PARTICLES_COEFF
 
     @property
     def pressure(self):
-        particle_count = self.fuel_particles + self.air_particles + self.exhaust_particles
-        return (self.temperature * boltzmann_constant * particle_count) / self.volume
-
-    @property
-    def external_piston_pressure(self):
-        return self.area * atmospheric_pressure
+        return self.temperature * (self.m_fuel * FUEL_PRESSURE_COEFF + self.m_air * AIR_PRESSURE_COEFF
+                                   + self.m_exhaust * EXHAUST_PRESSURE_COEFF) / self._volume
 
     @property
     def volume(self):
         """ The current volume of the cylinder, at its current crank angle """
-        return self.area * (self.height - self.pin_offset)
-
-    @property
-    def volume_at_TDC(self):
-        return self.area * (self.height - self.crank_radius + self.rod_length)
-
-    @property
-    def area(self):
-        return math.pi * (self.radius ** 2)
+        return self._volume
 
     @property
     def rpm(self):
-        return (self.crank_angular_velocity * 60.0) / (2.0 * math.pi)
+        return self.crank_angular_velocity * RAD_PER_SECOND_TO_RPM
 
     @property
     def piston_force(self):
@@ -80,21 +131,16 @@ class Cylinder:
 
     @property
     def crank_moment(self):
-        theta = self.crank_rotation + (math.pi / 8.0)
-        alpha = math.asin((self.crank_radius * math.sin(theta)) / self.rod_length)
+        theta = self.crank_rotation + _PI_8
+        sin_theta = self._sin_theta * _COS_PI_8 + self._cos_theta * _SIN_PI_8
+        alpha = _asin((self.crank_radius * sin_theta) / self.rod_length)
         beta = 90 - theta - alpha
 
-        print(self.piston_force)
-
-        return self.crank_radius * (self.piston_force * math.cos(beta))
-
-    @property
-    def stroke(self):
-        return 2.0 * self.crank_radius
+        return self.crank_radius * (self.piston_force * _cos(beta))
 
     @property
     def crank_position(self):
-        return self.crank_radius * math.sin(self.crank_rotation), self.crank_radius * math.cos(self.crank_rotation)
+        return self.crank_radius * self._sin_theta, self.crank_radius * self._cos_theta
 
     @property
     def pin_offset(self):
@@ -106,63 +152,54 @@ class Cylinder:
 
             # Solve quadratic
             x = r * cos(A) +/- sqrt( l**2 - (r**2 * sin(A)**2) )
-        """
 
-        a = self.crank_radius * math.cos(self.crank_rotation)
-        b = math.sqrt((self.rod_length ** 2) - ((self.crank_radius ** 2) * (math.sin(self.crank_rotation) ** 2)))
-        return a + b
+            Calculated by the crank_rotation setter
+        """
+        return self._pin_offset
 
 
     def spark(self):
         self.__combusting = True
 
-    @property
-    def cp_exhaust(self):
-        # baseline ~1.08 kJ/kgK at 300K, slope 8e-5 per K
-        return 1.08 + 8e-5 * (self.temperature - 300.0)
-
-    @property
-    def cp_air(self):
-        """ Fucking guess-estimate my ass """
-        return 1.005 + 0.0001 * (self.temperature - 300.0) / 100.0
-
-    @property
-    def average_cp(self):
-        mass_ex = self.contents["exhaust"]
-        mass_air = self.contents["air"]
-        return (self.cp_exhaust * mass_ex + self.cp_air * mass_air) / (mass_ex + mass_air + 1e-9)
-
     def __combust(self, deltaTime):
         # Only burn when piston is moving down (after TDC)
-        if math.cos(self.crank_rotation) < 0:
+        if self._cos_theta < 0:
             return  # skip until it's actually pushing down
 
-        fuel_quantity = min(fuel_burn_per_second * 0.1 * deltaTime, self.contents["fuel"])
+        m_air = self.m_air
+        m_exhaust = self.m_exhaust
+
+        fuel_quantity = min(scaled_fuel_burn_per_second * deltaTime, self.m_fuel)
 
         air_quantity = fuel_quantity * stoichiometric_air_fuel_ratio
 
-        if air_quantity > self.contents["air"]:
-            air_quantity = self.contents["air"]
-            fuel_quantity = air_quantity / stoichiometric_air_fuel_ratio
+        if air_quantity > m_air:
+            air_quantity = m_air
+            fuel_quantity = air_quantity * inverse_stoichiometric_air_fuel_ratio
 
-        mass = fuel_quantity + air_quantity + self.contents["exhaust"]
-        combustion_energy = fuel_quantity * fuel_energy_per_kg * 0.1
+        mass = fuel_quantity + air_quantity + m_exhaust
+        combustion_energy = fuel_quantity * scaled_fuel_energy_per_kg
 
         if combustion_energy == 0:
             self.__combusting = False
             return
 
+        # Mass weighted specific heat of what's in the cylinder
+        temperature = self.temperature
+        cp_exhaust = 1.08 + 8e-5 * (temperature - 300.0)  # baseline ~1.08 kJ/kgK at 300K, slope 8e-5 per K
+        cp_air = 1.005 + 0.0001 * (temperature - 300.0) / 100.0  # Fucking guess-estimate my ass
+        average_cp = (cp_exhaust * m_exhaust + cp_air * m_air) / (m_exhaust + m_air + 1e-9)
 
-        self.temperature += combustion_energy / (mass * self.average_cp)
+        self.temperature = temperature + combustion_energy / (mass * average_cp)
 
-        self.contents["fuel"] -= fuel_quantity
-        self.contents["air"] -= air_quantity
+        self.m_fuel -= fuel_quantity
+        self.m_air = m_air - air_quantity
 
-        self.contents["exhaust"] += (fuel_quantity + air_quantity)
+        self.m_exhaust = m_exhaust + (fuel_quantity + air_quantity)
 
     def inject(self, fuel: float, air: float):
-        self.contents["fuel"] += fuel
-        self.contents["air"] += air
+        self.m_fuel += fuel
+        self.m_air += air
 
     def exhaust(self):
         volume_change = self.previous_volume - self.volume
@@ -171,19 +208,24 @@ class Cylinder:
 
         self.temperature *= 0.99
 
-        for key in ["air", "exhaust"]:
-            self.contents[key] -= max_exhaust_mass
+        self.m_air -= max_exhaust_mass
+        if self.m_air < 0:
+            self.m_air = 0.0
 
-            if self.contents[key] < 0:
-                self.contents[key] = 0
+        self.m_exhaust -= max_exhaust_mass
+        if self.m_exhaust < 0:
+            self.m_exhaust = 0.0
 
 
 
     def __apply_angular_velocity(self, deltaTime):
-        self.crank_rotation += self.crank_angular_velocity * deltaTime
+        # Single write through the setter, so sin / cos are evaluated once per tick
+        rotation = self.crank_rotation + self.crank_angular_velocity * deltaTime
+
+        if rotation > FOUR_PI:
+            rotation -= FOUR_PI
 
-        if self.crank_rotation > 4 * math.pi:
-            self.crank_rotation -= 4 * math.pi
+        self.crank_rotation = rotation
 
 
     def simulate(self, deltaTime: float):
@@ -192,22 +234,59 @@ class Cylinder:
         if self.__combusting:
             self.__combust(deltaTime)
 
-        new_volume = float(self.volume)
-
-        gamma = 1.4  # for air
+        new_volume = self.volume
 
-        ratio = self.previous_volume / new_volume
-        if 1e-4 < ratio < 1e4:
-            ratio = max(0.5, min(2.0, ratio))
-            self.temperature *= ratio ** (gamma - 1)
+        # Adiabatic compression / expansion. Volume never reaches 0, so the ratio is always finite and positive
+        ratio = min(2.0, max(0.5, self.previous_volume / new_volume))
+        temperature = self.temperature * ratio ** GAMMA_MINUS_1
 
-        self.temperature -= (self.temperature - ROOM_TEMP) * 0.0001
-        self.temperature = max(min(self.temperature, 4000), 250)
+        # Cool towards room temp, then clamp
+        temperature -= (temperature - ROOM_TEMP) * 0.0001
+        self.temperature = min(4000.0, max(250.0, temperature))
         self.previous_volume = new_volume
 
+    def step_physics(self, deltaTime: float) -> float:
+        """
+            simulate() followed by crank_moment, returning the moment.
+
+            Same maths as the pressure -> piston_force -> crank_moment properties, but as straight-line locals
+            so the per tick path doesn't walk the property chain. The properties are kept for the view / debug.
+        """
+        self.simulate(deltaTime)
+
+        area = self.area
+        m_fuel = self.m_fuel
+        m_air = self.m_air
+        m_exhaust = self.m_exhaust
+
+        if m_fuel == 0.0 and m_air == 0.0 and m_exhaust == 0.0:
+            # Empty cylinder (e.g. no throttle), skip the particle maths. Same result as the formula below
+            pressure = 0.0
+        else:
+            pressure = self.temperature * (m_fuel * FUEL_PRESSURE_COEFF + m_air * AIR_PRESSURE_COEFF
+                                           + m_exhaust * EXHAUST_PRESSURE_COEFF) / self._volume
+
+        piston_force = (pressure - self.external_piston_pressure) * area
+
+        theta = self._crank_rotation + _PI_8
+        sin_theta = self._sin_theta * _COS_PI_8 + self._cos_theta * _SIN_PI_8
+        alpha = _asin((self.crank_radius * sin_theta) / self.rod_length)
+        beta = 90 - theta - alpha
+
+        return self.crank_radius * (piston_force * _cos(beta))
+
 
 
 class Engine:
+    __slots__ = (
+        "cylinder_radius_mm", "cylinder_height_mm", "rod_length_mm", "crank_radius_mm", "crank_mass_kg",
+        "moment_of_inertia",
+        "starter_torque", "friction_coefficient",
+        "cylinders", "cylinder_stages", "fire_order",
+        "last_fire", "starter_timer",
+        "fuel_volume_per_cycle", "idle_fuel_volume_per_cycle", "idle_rpm", "throttle",
+    )
+
     def __init__(self):
         self.cylinder_radius_mm = 100
         self.cylinder_height_mm = 80
@@ -215,6 +294,9 @@ class Engine:
         self.crank_radius_mm = 15
         self.crank_mass_kg = 30
 
+        crank_radius_m = self.crank_radius_mm / 1000
+        self.moment_of_inertia = self.crank_mass_kg * crank_radius_m * crank_radius_m
+
         self.starter_torque = 200  # Nm
         self.friction_coefficient = 0.8
 
@@ -223,7 +305,7 @@ class Engine:
                      self.rod_length_mm / 1000)
         ]
 
-        self.cylinder_stages = []  # Auto generated
+        self.cylinder_stages = array("B")  # Auto generated
         self.fire_order = [0]
 
         self.__prepare_cylinders()
@@ -240,25 +322,23 @@ class Engine:
         self.throttle = 0
 
     def __prepare_cylinders(self):
-        shift = (4 * math.pi) / len(self.cylinders)
+        shift = FOUR_PI / len(self.cylinders)
         for i, cylinder in enumerate(self.cylinders):
-            cylinder.crank_rotation = i * shift + (math.pi / 8)  # add slight offset
+            cylinder.crank_rotation = i * shift + _PI_8  # add slight offset
 
-        self.cylinder_stages = [index for index in self.fire_order]
+        self.cylinder_stages = array("B", self.fire_order)
 
     @property
     def rpm(self):
-        return sum([c.rpm for c in self.cylinders]) / len(self.cylinders)
-
-    @property
-    def moment_of_inertia(self):
-        return self.crank_mass_kg * (self.crank_radius_mm / 1000) ** 2
+        # Read once per tick by do_computer, so average the raw velocities instead of each cylinder's rpm property
+        angular_velocity = sum([c.crank_angular_velocity for c in self.cylinders]) / len(self.cylinders)
+        return angular_velocity * RAD_PER_SECOND_TO_RPM
 
     def run_starter(self, deltaTime: float):
-        angular_acceleration = self.starter_torque / self.moment_of_inertia
+        velocity_change = (self.starter_torque / self.moment_of_inertia) * deltaTime
 
         for cylinder in self.cylinders:
-            cylinder.crank_angular_velocity += angular_acceleration * deltaTime
+            cylinder.crank_angular_velocity += velocity_change
 
     def start(self):
         self.starter_timer = 5.0
@@ -274,30 +354,34 @@ class Engine:
         if self.rpm < self.idle_rpm:
             fuel_volume = self.idle_fuel_volume_per_cycle
 
-        for idx, cylinder in enumerate(self.cylinders):
-            stage = (self.fire_order[idx] + ((cylinder.crank_rotation % (4 * math.pi)) // math.pi)) % 4
-            if self.cylinder_stages[idx] == stage and stage != 3.0:
+        air_volume = fuel_volume * stoichiometric_air_fuel_ratio
+        cylinder_stages = self.cylinder_stages
+
+        for idx, (cylinder, fire_offset) in enumerate(zip(self.cylinders, self.fire_order)):
+            # Rotation mod 4pi is never negative, so int() floors and & 3 is the same as % 4
+            stage = (fire_offset + int((cylinder.crank_rotation % FOUR_PI) * INV_PI)) & 3
+            if cylinder_stages[idx] == stage:
+                # Only the exhaust stage does work every tick, the rest act on entering the stage
+                if stage == 3:
+                    cylinder.exhaust()
                 continue
 
-            self.cylinder_stages[idx] = stage
+            cylinder_stages[idx] = stage
             match stage:
-                case 0.0:
+                case 0:
                     cylinder.mode = "INJECT"
-                    cylinder.inject(fuel_volume, fuel_volume * stoichiometric_air_fuel_ratio)
-                    break
-                case 1.0:
+                    cylinder.inject(fuel_volume, air_volume)
+
+                case 1:
                     cylinder.mode = "COMPRESS"
-                    break
 
-                case 2.0:
+                case 2:
                     cylinder.mode = "COMBUST"
                     cylinder.spark()
-                    break
 
-                case 3.0:
+                case 3:
                     cylinder.mode = "EXHAUST"
                     cylinder.exhaust()
-                    break
 
 
     def simulate(self, deltaTime: float):
@@ -305,13 +389,11 @@ class Engine:
 
         crank_moment = 0
         for cylinder in self.cylinders:
-            cylinder.simulate(deltaTime)
-            moment = cylinder.crank_moment
-            crank_moment += moment
-
+            crank_moment += cylinder.step_physics(deltaTime)
 
-        angular_acceleration = crank_moment / self.moment_of_inertia
+        # Same change for every cylinder (they share the crank), so only work it out once
+        velocity_change = (crank_moment / self.moment_of_inertia) * deltaTime
+        friction = self.friction_coefficient
 
         for cylinder in self.cylinders:
-            cylinder.crank_angular_velocity += angular_acceleration * deltaTime
-            cylinder.crank_angular_velocity *= self.friction_coefficient
+            cylinder.crank_angular_velocity = (cylinder.crank_angular_velocity + velocity_change) * friction
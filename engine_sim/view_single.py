@@ -4,14 +4,29 @@ import math
 from .sim import Cylinder
 
 
+# kelvin_to_rgb results at 1K resolution, filled in on first use of each temperature
+_RGB_LUT: list[tuple[int, int, int] | None] = [None] * (40000 - 1000 + 1)
+
+
 def kelvin_to_rgb(temp_k: float) -> tuple[int, int, int]:
     """
     Convert a color temperature in Kelvin to an approximate RGB color.
-    Returns (R, G, B) values from 0–255 -> BLACK MAGIC
+    Returns (R, G, B) values from 0–255, cached per whole Kelvin
     """
 
     # Clamp to valid range for this approximation
-    temp_k = max(1000.0, min(temp_k, 40000)) / 100.0
+    index = int(max(1000.0, min(temp_k, 40000))) - 1000
+
+    colour = _RGB_LUT[index]
+    if colour is None:
+        colour = _RGB_LUT[index] = _kelvin_to_rgb(index + 1000)
+
+    return colour
+
+
+def _kelvin_to_rgb(temp_k: float) -> tuple[int, int, int]:
+    """ The uncached closed form behind kelvin_to_rgb, for a temperature already clamped to 1000–40000K """
+    temp_k = temp_k / 100.0  # BLACK MAGIC
 
     # Red
     if temp_k <= 66:
@@ -49,8 +64,13 @@ class View:
         self.cylinder = cylinder
         self.debug = debug
 
+        # Debug text surfaces, keyed by what the line shows -> (last text, rendered surface)
+        self.text_cache = {}
+
         if self.debug:
-            self.debug_layer = pygame.Surface(self.surface.get_size(), pygame.SRCALPHA)
+            # Colour keyed rather than per pixel alpha, the overlay is all solid colours so black is transparent
+            self.debug_layer = pygame.Surface(self.surface.get_size())
+            self.debug_layer.set_colorkey((0, 0, 0))
             self.font = pygame.sysfont.SysFont("monospace", 16)
 
         self.view_x = self.surface.get_width() // 2
@@ -58,15 +78,34 @@ class View:
         self.scale = 5  # Please dont change this. Rendering is fucked
         self.down_offset = 200
 
+        # Pixel space sizes / positions, constant for the lifetime of the view
+        self._crank_px = (self.cylinder.crank_radius * 1000) * self.scale
+        self._radius_px = self.cylinder.radius * 1000  # Not scaled, matches the piston / cylinder drawing
+        self._height_px = (self.cylinder.height * 1000) * self.scale
+        self._third_width = self._crank_px * (2 / 3)
+        self._sixth_width = int(self._third_width // 2)
+        self._shaft_width = int(self._crank_px * (2 / 6))
+        self._crank_center = (self.view_x, self.view_y + self.down_offset)
+        self._crank_sprite_center = (
+            self.view_x - self._crank_px + self._crank_px,  # Something isn't right!
+            self.view_y + self._crank_px + self._crank_px + 50  # bodge constant
+        )
+        self._cylinder_top = (self.view_x, self.view_y + self.down_offset - self._height_px)
+
         self.crank_view = self.__generate_crank_surface()
+        self.crank_rotations = self.__generate_crank_rotations()
+        self.cylinder_walls, self._cylinder_walls_pos = self.__generate_cylinder_walls()
+
+        # Everything drawn in the last frame, None until the first full draw
+        self.frame_rects = None
 
     def __generate_crank_surface(self):
-        surface = pygame.Surface(((self.cylinder.crank_radius * 1000) * self.scale * 2 + (10 * self.scale),
-                                  (self.cylinder.crank_radius * 1000) * self.scale * 2 + (10 * self.scale)),
+        surface = pygame.Surface((self._crank_px * 2 + (10 * self.scale),
+                                  self._crank_px * 2 + (10 * self.scale)),
                                  pygame.SRCALPHA)
 
-        third_width = (self.cylinder.crank_radius * 1000) * self.scale * (2 / 3)
-        sixth_width = int(third_width // 2)
+        third_width = self._third_width
+        sixth_width = self._sixth_width
 
         pygame.draw.rect(
             surface,
@@ -84,157 +123,232 @@ class View:
 
         return surface
 
-    def render_crank(self):
-        angle_degrees = -math.degrees(self.cylinder.crank_rotation)
-        rotated_image = pygame.transform.rotate(self.crank_view, angle_degrees)
-
-        original_center_x = self.view_x - (self.cylinder.crank_radius * 1000) * self.scale + (
-                    (self.cylinder.crank_radius * 1000) * self.scale)  # Something isn't right!
-        original_center_y = self.view_y + (self.cylinder.crank_radius * 1000) * self.scale + (
-                    (self.cylinder.crank_radius * 1000) * self.scale) + 50  # bodge constant
+    def __generate_crank_rotations(self):
+        """
+            The crank sprite pre-rotated to every whole degree, so _render_crank_main doesn't rotate it every frame.
 
-        rotated_rect = rotated_image.get_rect(center=(original_center_x, original_center_y))
-        self.surface.blit(rotated_image, rotated_rect.topleft)
+            Each rotation is cropped to its visible pixels (most of a rotated surface is transparent padding), and
+            stored with the screen position it is blitted at, as the sprite center never moves.
+        """
+        rotations = []
 
-        if self.debug:
-            dx, dy = self.cylinder.crank_position
-            pygame.draw.line(
-                self.debug_layer,
-                (0, 0, 255),
-                (self.view_x, self.view_y + self.down_offset),
-                (self.view_x + (dx * 1000) * self.scale, self.view_y + self.down_offset - (dy * 1000) * self.scale),
-                width=3,
-            )
+        for angle in range(360):
+            rotated_image = pygame.transform.rotate(self.crank_view, angle)
+            rotated_rect = rotated_image.get_rect(center=self._crank_sprite_center)
+            bounds = rotated_image.get_bounding_rect()
 
-            pygame.draw.circle(
-                self.debug_layer,
-                (255, 0, 0),
-                (self.view_x, self.view_y + self.down_offset),
-                (self.cylinder.crank_radius * 1000) * self.scale,
-                width=self.scale // 2
-            )
+            rotations.append((
+                rotated_image.subsurface(bounds).copy(),
+                (rotated_rect.x + bounds.x, rotated_rect.y + bounds.y)
+            ))
 
-            pygame.draw.circle(
-                self.debug_layer,
-                (255, 0, 0),
-                (self.view_x, self.view_y + self.down_offset),
-                2,
-            )
+        return rotations
 
-    def render_piston_shaft(self):
-        dx, dy = self.cylinder.crank_position
+    def __generate_cylinder_walls(self):
+        """ The cylinder walls never move, so they are drawn once and blitted each frame """
+        center_x, center_y = self._cylinder_top
+        radius_px = self._radius_px
 
-        pygame.draw.line(
-            self.surface,
-            (140, 140, 140),
-            (self.view_x, self.view_y + self.down_offset - ((self.cylinder.pin_offset * 1000) * self.scale)),
-            (self.view_x + (dx * 1000) * self.scale, self.view_y + self.down_offset - (dy * 1000) * self.scale),
-            width=int((self.cylinder.crank_radius * 1000) * self.scale * (2 / 6))
+        walls = (
+            ((center_x + radius_px + 2, center_y), (center_x + radius_px + 2, center_y + (radius_px * 2))),
+            ((center_x - radius_px - 2, center_y), (center_x - radius_px - 2, center_y + (radius_px * 2))),
+            ((center_x - radius_px - 2, center_y), (center_x + radius_px + 2, center_y)),
         )
 
-        if self.debug:
-            pygame.draw.line(
-                self.debug_layer,
-                (0, 0, 255),
-                (self.view_x, self.view_y + self.down_offset - ((self.cylinder.pin_offset * 1000) * self.scale)),
-                (self.view_x + (dx * 1000) * self.scale, self.view_y + self.down_offset - (dy * 1000) * self.scale),
-                width=3,
-            )
+        # Whole pixel origin with room for the line width, so the lines come out the same as drawing them in place
+        left = math.floor(center_x - radius_px - 2) - 4
+        top = math.floor(center_y) - 4
+        right = math.ceil(center_x + radius_px + 2) + 4
+        bottom = math.ceil(center_y + (radius_px * 2)) + 4
+
+        surface = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
 
+        for start, end in walls:
             pygame.draw.line(
-                self.debug_layer,
-                (255, 255, 0),
-                (self.view_x, self.view_y + self.down_offset - ((self.cylinder.pin_offset * 1000) * self.scale)),
-                (self.view_x, self.view_y + self.down_offset),
-                width=1,
+                surface,
+                (160, 160, 160),
+                (start[0] - left, start[1] - top),
+                (end[0] - left, end[1] - top),
+                width=4
             )
 
-    def render_piston_head(self):
-        center_x, center_y = self.view_x, self.view_y + self.down_offset - (
-                    (self.cylinder.pin_offset * 1000) * self.scale)
+        return surface, (left, top)
 
-        pygame.draw.rect(
+    def render_text(self, key: str, text: str):
+        """ font.render, but only re-rasterised when the text for that line changes """
+        cached = self.text_cache.get(key)
+
+        if cached is None or cached[0] != text:
+            cached = self.text_cache[key] = (text, self.font.render(text, True, (255, 255, 255)))
+
+        return cached[1]
+
+    def _render_crank_main(self):
+        angle_degrees = -math.degrees(self.cylinder.crank_rotation)
+        rotated_image, position = self.crank_rotations[round(angle_degrees) % 360]
+
+        self.frame_rects.append(self.surface.blit(rotated_image, position))
+
+    def _render_crank_debug(self, crank_pin):
+        self.frame_rects.append(pygame.draw.line(
+            self.debug_layer,
+            (0, 0, 255),
+            self._crank_center,
+            crank_pin,
+            width=3,
+        ))
+
+        self.frame_rects.append(pygame.draw.circle(
+            self.debug_layer,
+            (255, 0, 0),
+            self._crank_center,
+            self._crank_px,
+            width=self.scale // 2
+        ))
+
+        self.frame_rects.append(pygame.draw.circle(
+            self.debug_layer,
+            (255, 0, 0),
+            self._crank_center,
+            2,
+        ))
+
+    def _render_piston_shaft_main(self, piston_pin, crank_pin):
+        self.frame_rects.append(pygame.draw.line(
+            self.surface,
+            (140, 140, 140),
+            piston_pin,
+            crank_pin,
+            width=self._shaft_width
+        ))
+
+    def _render_piston_shaft_debug(self, piston_pin, crank_pin):
+        self.frame_rects.append(pygame.draw.line(
+            self.debug_layer,
+            (0, 0, 255),
+            piston_pin,
+            crank_pin,
+            width=3,
+        ))
+
+        self.frame_rects.append(pygame.draw.line(
+            self.debug_layer,
+            (255, 255, 0),
+            piston_pin,
+            self._crank_center,
+            width=1,
+        ))
+
+    def _render_piston_head_main(self, piston_pin):
+        center_x, center_y = piston_pin
+
+        self.frame_rects.append(pygame.draw.rect(
             self.surface,
             (150, 150, 150),
-            (center_x - (self.cylinder.radius * 1000) + 1, center_y, (self.cylinder.radius * 1000) * 2, 50),
+            (center_x - self._radius_px + 1, center_y, self._radius_px * 2, 50),
             border_radius=5
-        )
+        ))
 
-        if self.debug:
-            pygame.draw.line(
-                self.debug_layer,
-                (255, 0, 0),
-                (center_x - (self.cylinder.radius * 1000), center_y),
-                (center_x + (self.cylinder.radius * 1000), center_y)
-            )
-
-    def render_cylinder(self):
-        center_x, center_y = self.view_x, self.view_y + self.down_offset - ((self.cylinder.height * 1000) * self.scale)
+    def _render_piston_head_debug(self, piston_pin):
+        center_x, center_y = piston_pin
 
-        pygame.draw.line(
-            self.surface,
-            (160, 160, 160),
-            (center_x + (self.cylinder.radius * 1000) + 2, center_y),
-            (center_x + (self.cylinder.radius * 1000) + 2, center_y + ((self.cylinder.radius * 1000) * 2)),
-            width=4
-        )
+        self.frame_rects.append(pygame.draw.line(
+            self.debug_layer,
+            (255, 0, 0),
+            (center_x - self._radius_px, center_y),
+            (center_x + self._radius_px, center_y)
+        ))
 
-        pygame.draw.line(
-            self.surface,
-            (160, 160, 160),
-            (center_x - (self.cylinder.radius * 1000) - 2, center_y),
-            (center_x - (self.cylinder.radius * 1000) - 2, center_y + ((self.cylinder.radius * 1000) * 2)),
-            width=4
-        )
+    def _render_cylinder_main(self):
+        center_x, center_y = self._cylinder_top
+        radius_px = self._radius_px
 
-        pygame.draw.line(
-            self.surface,
-            (160, 160, 160),
-            (center_x - (self.cylinder.radius * 1000) - 2, center_y),
-            (center_x + (self.cylinder.radius * 1000) + 2, center_y),
-            width=4
-        )
+        self.frame_rects.append(self.surface.blit(self.cylinder_walls, self._cylinder_walls_pos))
 
         colour = kelvin_to_rgb(self.cylinder.temperature)
 
-        pygame.draw.rect(
-            self.surface,
+        self.frame_rects.append(self.surface.fill(
             colour,
-            (center_x - (self.cylinder.radius * 1000) + 1, center_y + 2,
-             (self.cylinder.radius * 1000) * 2, ((self.cylinder.height - self.cylinder.pin_offset) * 1000 * self.scale))
-        )
+            (center_x - radius_px + 1, center_y + 2,
+             radius_px * 2, ((self.cylinder.height - self.cylinder.pin_offset) * 1000 * self.scale))
+        ))
 
-        if self.debug:
-            rect = self.font.render(f"{round(self.cylinder.temperature - 273)}°C", True, (255, 255, 255))
-            self.debug_layer.blit(
-                rect, (center_x - rect.get_width() // 2, center_y + 10)
-            )
+    def _render_cylinder_debug(self):
+        center_x, center_y = self._cylinder_top
+
+        rect = self.render_text("temperature", f"{round(self.cylinder.temperature - 273)}°C")
+        self.frame_rects.append(self.debug_layer.blit(
+            rect, (center_x - rect.get_width() // 2, center_y + 10)
+        ))
+
+    def _render_debug(self, piston_pin, crank_pin):
+        """ Everything on the debug layer, only called when debug is on """
+        self._render_piston_shaft_debug(piston_pin, crank_pin)
+        self._render_crank_debug(crank_pin)
+        self._render_piston_head_debug(piston_pin)
+        self._render_cylinder_debug()
+
+        text = self.render_text("stats", "Stats")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 5)))
+
+        text = self.render_text("rpm", f"RPM: {round(self.cylinder.rpm)}")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 20)))
+
+        text = self.render_text("mode", f"Mode: {self.cylinder.mode}")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 35)))
+
+        text = self.render_text("content", f"Content: Air - {round(self.cylinder.m_air, 3)}, Fuel - {round(self.cylinder.m_fuel, 3)}, Exhaust - {round(self.cylinder.m_exhaust, 3)}")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 50)))
+
+        text = self.render_text("throttle", f"Throttle: {round(self.engine.throttle, 2)}")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 65)))
+
+        text = self.render_text("piston_force", f"Piston Force: {round(self.cylinder.piston_force)}N")
+        self.frame_rects.append(self.debug_layer.blit(text, (5, 80)))
 
     def draw(self):
-        self.surface.fill((0, 0, 0))
+        """
+            Draws the frame, returning the rects that changed since the last one (for pygame.display.update)
 
-        if self.debug:
-            self.debug_layer.fill((0, 0, 0, 0))
+            Only the areas drawn last frame are cleared, rather than the whole surface. Everything is redrawn each
+            frame, so anything outside of those areas is still black.
+        """
+        previous_rects = self.frame_rects
+        self.frame_rects = []
 
-        self.render_piston_shaft()
-        self.render_crank()
-        self.render_piston_head()
-        self.render_cylinder()
+        if previous_rects is None:
+            self.surface.fill((0, 0, 0))
+            previous_rects = [self.surface.get_rect()]
 
-        if self.debug:
-            text = self.font.render(f"Stats", True, (255, 255, 255))
-            self.debug_layer.blit(text, (5, 5))
+            if self.debug:
+                self.debug_layer.fill((0, 0, 0))
+
+        else:
+            for rect in previous_rects:
+                self.surface.fill((0, 0, 0), rect)
+
+                if self.debug:
+                    self.debug_layer.fill((0, 0, 0), rect)
+
+        dx, dy = self.cylinder.crank_position
+
+        # Both ends of the rod in pixel space, shared by the geometry and the debug overlay
+        piston_pin = (self.view_x, self.view_y + self.down_offset - ((self.cylinder.pin_offset * 1000) * self.scale))
+        crank_pin = (self.view_x + (dx * 1000) * self.scale, self.view_y + self.down_offset - (dy * 1000) * self.scale)
 
-            text = self.font.render(f"RPM: {round(self.cylinder.rpm)}", True, (255, 255, 255))
-            self.debug_layer.blit(text, (5, 20))
+        self._render_piston_shaft_main(piston_pin, crank_pin)
+        self._render_crank_main()
+        self._render_piston_head_main(piston_pin)
+        self._render_cylinder_main()
 
-            text = self.font.render(f"Mode: {self.cylinder.mode}", True, (255, 255, 255))
-            self.debug_layer.blit(text, (5, 35))
+        if self.debug:
+            self._render_debug(piston_pin, crank_pin)
 
-            text = self.font.render(f"Content: Air - {round(self.cylinder.contents['air'], 3)}, Fuel - {round(self.cylinder.contents['fuel'], 3)}, Exhaust - {round(self.cylinder.contents['exhaust'], 3)}", True, (255, 255, 255))
-            self.debug_layer.blit(text, (5, 50))
+        dirty_rects = previous_rects + self.frame_rects
 
-            text = self.font.render(f"Throttle: {round(self.engine.throttle, 2)}", True, (255, 255, 255))
-            self.debug_layer.blit(text, (5, 65))
+        if self.debug:
+            # One blit over the bounds rather than one per rect
+            bounds = dirty_rects[0].unionall(dirty_rects[1:])
+            self.surface.blit(self.debug_layer, bounds, bounds)
 
-            self.surface.blit(self.debug_layer, (0, 0))
+        return dirty_rects